@@ -6,6 +6,10 @@ class TelegramSendMessageError(LoggingOnlyError):
     pass
 
 
+class TelegramTemporaryError(TelegramSendMessageError):
+    pass
+
+
 class APIError(Exception):
     pass
 
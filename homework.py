@@ -1,29 +1,81 @@
+import json
 import logging
 import os
+import random
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
-from time import time, sleep
+from itertools import takewhile
+from threading import Lock
+from time import monotonic, sleep, time
 
 import requests
-from dotenv import load_dotenv
-import telegram
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 from exceptions import (
     TelegramSendMessageError,
+    TelegramTemporaryError,
     APIError,
     BadCurrentDate,
     LoggingOnlyError
 )
 
-load_dotenv()
+# .env читается, только если в окружении нет одного из токенов.
+# Если токены заданы в окружении, LOG_VERBOSE тоже нужно задать в нём.
+if not all(map(os.getenv, ('PRACTICUM_TOKEN',
+                           'TELEGRAM_TOKEN',
+                           'TELEGRAM_CHAT_ID'))):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+logger = logging.getLogger(__name__)
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+LOG_VERBOSE = os.getenv('LOG_VERBOSE', '').lower() in ('1', 'true', 'yes')
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+VERBOSE_LOG_FORMAT = ('%(asctime)s '
+                      '- %(levelname)s '
+                      '- строка %(lineno)d '
+                      '- %(funcName)s '
+                      '- %(message)s'
+                      )
 
 RETRY_TIME = 600
+MIN_RETRY_TIME = 30
+START_RETRY_TIME = 60
+RETRY_TIME_FACTOR = 1.5
+TIMEOUT = 30
+POOL_CONNECTIONS = 2
+POOL_MAXSIZE = 4
+SEND_WORKERS = 4
+TELEGRAM_RATE_LIMIT = 30
+ERROR_REPORT_TTL = 3600
+ERROR_REPORT_CACHE_SIZE = 8
+API_ATTEMPTS = 3
+BACKOFF_FACTOR = 1
+BACKOFF_MAX = 30
+BACKOFF_JITTER = 0.5
+RETRY_STATUSES = (
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+)
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+TELEGRAM_URL = f'https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+PARAMS = {'from_date': 0}
+MISSING = object()
+TOKEN_LOGGERS = ('urllib3.connectionpool', 'urllib3.util.retry')
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -31,21 +83,236 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+VERDICT_TEMPLATES = {
+    status: f'Изменился статус проверки работы "{{name}}". {verdict}'
+    for status, verdict in HOMEWORK_VERDICTS.items()
+}
+
+
+class JitterRetry(Retry):
+    """
+    Повтор запроса с экспоненциальной задержкой не дольше BACKOFF_MAX.
+    Перед n-м повтором ждёт BACKOFF_FACTOR * 2 ** (n - 1) секунд
+    плюс случайный разброс до BACKOFF_JITTER секунд,
+    чтобы повторы после общего сбоя API не шли одновременно.
+    Ожидание по заголовку Retry-After тоже ограничено BACKOFF_MAX.
+    """
+
+    def get_backoff_time(self):
+        """Вычисляет задержку перед очередным повтором."""
+        retries = len(list(takewhile(
+            lambda attempt: attempt.redirect_location is None,
+            reversed(self.history)
+        )))
+        if not retries:
+            return 0
+        return min(
+            BACKOFF_MAX,
+            self.backoff_factor * 2 ** (retries - 1)
+            + random.uniform(0, BACKOFF_JITTER)
+        )
+
+    def get_retry_after(self, response):
+        """Ограничивает ожидание по Retry-After значением BACKOFF_MAX."""
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, BACKOFF_MAX)
+
+
+API_CACHE = {
+    'from_date': None,
+    'etag': None,
+    'last_modified': None,
+    'payload': None,
+}
+
+SESSION = requests.Session()
+API_ADAPTER = HTTPAdapter(
+    pool_connections=POOL_CONNECTIONS,
+    pool_maxsize=POOL_MAXSIZE,
+    pool_block=False,
+    max_retries=JitterRetry(
+        total=API_ATTEMPTS - 1,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+    ),
+)
+SESSION.mount('http://', API_ADAPTER)
+SESSION.mount('https://', API_ADAPTER)
+TELEGRAM_ADAPTER = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=SEND_WORKERS,
+    pool_block=False,
+    max_retries=JitterRetry(
+        total=API_ATTEMPTS - 1,
+        read=False,
+        backoff_factor=BACKOFF_FACTOR,
+        respect_retry_after_header=False,
+    ),
+)
+SESSION.mount('https://api.telegram.org/', TELEGRAM_ADAPTER)
+
+
+class RateLimiter:
+    """
+    Ограничивает частоту вызовов по алгоритму token bucket.
+    Допускает не больше rate вызовов в секунду
+    и всплеск не больше rate вызовов подряд.
+    """
+
+    def __init__(self, rate):
+        """Создаёт ограничитель с полным запасом вызовов."""
+        self.rate = rate
+        self.tokens = rate
+        self.updated = monotonic()
+        self.lock = Lock()
+
+    def acquire(self):
+        """Ждёт, пока не освободится место для очередного вызова."""
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(
+                self.rate, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            sleep(wait)
+
+
+TELEGRAM_LIMITER = RateLimiter(TELEGRAM_RATE_LIMIT)
+
+
+def hide_token(text):
+    """Заменяет токен бота в тексте на ***."""
+    if not TELEGRAM_TOKEN:
+        return text
+    return text.replace(TELEGRAM_TOKEN, '***')
+
+
+class HideTokenFilter(logging.Filter):
+    """
+    Скрывает токен бота в записях лога.
+    Нужен для логов urllib3: при повторах запроса он пишет URL
+    вида /bot<TELEGRAM_TOKEN>/sendMessage.
+    """
+
+    def filter(self, record):
+        """Подменяет текст записи, если в нём есть токен."""
+        message = record.getMessage()
+        hidden = hide_token(message)
+        if hidden != message:
+            record.msg = hidden
+            record.args = ()
+        return True
+
+
+for logger_name in TOKEN_LOGGERS:
+    logging.getLogger(logger_name).addFilter(HideTokenFilter())
 
-def send_message(message, bot):
-    """Отправляет сообщение TELEGRAM_CHAT_ID."""
+
+def telegram_retry_after(response):
+    """
+    Возвращает паузу, которую Telegram просит выдержать после ответа 429.
+    Пауза в секундах берётся из parameters.retry_after в теле ответа,
+    а если его нет — из заголовка Retry-After.
+    """
+    try:
+        return int(json_loads(response.content)['parameters']['retry_after'])
+    except (ValueError, KeyError, TypeError):
+        pass
     try:
-        bot.send_message(
-            chat_id=TELEGRAM_CHAT_ID,
-            text=message,
+        return int(response.headers['Retry-After'])
+    except (ValueError, KeyError):
+        return BACKOFF_FACTOR
+
+
+def send_message(message, session):
+    """
+    Отправляет сообщение TELEGRAM_CHAT_ID через Bot API.
+    Запрос идёт через переданную сессию, поэтому соединение
+    с api.telegram.org переиспользуется между сообщениями.
+    На ответ 429 выжидает указанную Telegram паузу
+    и повторяет запрос, всего не больше API_ATTEMPTS попыток.
+    Сбои, после которых отправку стоит повторить позже
+    (ошибки соединения, 429, 5xx), выбрасываются
+    как TelegramTemporaryError.
+    """
+    for attempt in range(1, API_ATTEMPTS + 1):
+        TELEGRAM_LIMITER.acquire()
+        try:
+            response = session.post(
+                TELEGRAM_URL,
+                json={'chat_id': TELEGRAM_CHAT_ID, 'text': message},
+                timeout=TIMEOUT,
+            )
+        except requests.exceptions.RequestException as error:
+            raise TelegramTemporaryError(
+                'Попытка отправить сообщение в Telegram '
+                f'закончилась ошибкой "{hide_token(str(error))}"'
+            )
+        if (response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+                or attempt == API_ATTEMPTS):
+            break
+        retry_after = telegram_retry_after(response)
+        logger.warning(
+            'Telegram ограничил частоту отправки, повтор через %s сек',
+            retry_after
         )
-    except telegram.error.TelegramError as error:
-        raise TelegramSendMessageError(
+        sleep(retry_after)
+    if response.status_code != HTTPStatus.OK:
+        error_class = TelegramSendMessageError
+        if (response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+                or response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR):
+            error_class = TelegramTemporaryError
+        raise error_class(
             'Попытка отправить сообщение в Telegram '
-            f'закончилась ошибкой "{error}"'
+            f'закончилась ошибкой "{response.status_code} {response.reason}"'
         )
-    else:
-        logging.info(f'Сообщение "{message}" отправлено в телеграм')
+    logger.info('Сообщение "%s" отправлено в телеграм', message)
+
+
+def send_messages(messages, session):
+    """
+    Параллельно отправляет сообщения TELEGRAM_CHAT_ID.
+    messages — словарь {название работы: сообщение}.
+    Порядок сообщений о разных работах может не совпадать
+    с порядком в messages.
+    Ошибка отправки одного сообщения не прерывает отправку остальных:
+    каждая ошибка логируется.
+    Возвращает словарь сообщений, отправку которых стоит повторить;
+    сообщения, отклонённые Telegram (4xx кроме 429), отбрасываются.
+    """
+    with ThreadPoolExecutor(max_workers=SEND_WORKERS) as executor:
+        futures = {
+            name: executor.submit(send_message, message, session)
+            for name, message in messages.items()
+        }
+    unsent_messages = {}
+    for name, future in futures.items():
+        error = future.exception()
+        if error is None:
+            continue
+        logger.error(error)
+        if isinstance(error, TelegramTemporaryError):
+            unsent_messages[name] = messages[name]
+    return unsent_messages
+
+
+def collect_messages(homework_statuses, unsent_messages):
+    """
+    Готовит сообщения для send_messages.
+    К неотправленным ранее сообщениям добавляет сообщения
+    о новых статусах работ. Если у работы появился новый статус,
+    неотправленное сообщение о старом статусе заменяется новым.
+    """
+    messages = dict(unsent_messages)
+    for homework in homework_statuses:
+        messages[homework['homework_name']] = parse_status(homework)
+    return messages
 
 
 def get_api_answer(current_timestamp):
@@ -53,21 +320,45 @@ def get_api_answer(current_timestamp):
     Делает запрос к эндпоинту API-сервиса.
     В случае успешного запроса возвращает ответ API,
     преобразовав его из формата JSON к типам данных Python.
+    Соединение с API переиспользуется между запросами через SESSION.
+    Повторный запрос с тем же from_date отправляется условным
+    (If-None-Match/If-Modified-Since), и на ответ 304 возвращается
+    сохранённый в API_CACHE результат. После успешной итерации main()
+    переходит к новому current_date, поэтому from_date повторяется
+    только при повторе итерации, завершившейся ошибкой.
     """
+    headers = HEADERS
+    if API_CACHE['from_date'] == current_timestamp:
+        headers = dict(HEADERS)
+        if API_CACHE['etag']:
+            headers['If-None-Match'] = API_CACHE['etag']
+        if API_CACHE['last_modified']:
+            headers['If-Modified-Since'] = API_CACHE['last_modified']
+    PARAMS['from_date'] = current_timestamp
     try:
-        api_data = requests.get(
+        api_data = SESSION.get(
             ENDPOINT,
-            headers=HEADERS,
-            params={'from_date': current_timestamp},
+            headers=headers,
+            params=PARAMS,
+            timeout=TIMEOUT,
         )
+        if api_data.status_code == HTTPStatus.NOT_MODIFIED:
+            return API_CACHE['payload']
         if api_data.status_code != HTTPStatus.OK:
             api_data.raise_for_status()
-        return api_data.json()
+        payload = json_loads(api_data.content)
     except requests.exceptions.RequestException as error:
         raise APIError(
-            f'Запрос к API ({api_data.url}) '
+            f'Запрос к API ({ENDPOINT}) '
             f'закончился ошибкой {error}'
         )
+    API_CACHE.update(
+        from_date=current_timestamp,
+        etag=api_data.headers.get('ETag'),
+        last_modified=api_data.headers.get('Last-Modified'),
+        payload=payload,
+    )
+    return payload
 
 
 def check_response(response):
@@ -81,19 +372,21 @@ def check_response(response):
     """
     if not isinstance(response, dict):
         raise TypeError('API вернул не словарь')
-    if 'homeworks' not in response:
+    homeworks = response.get('homeworks', MISSING)
+    if homeworks is MISSING:
         raise KeyError(
             'В ответе API нет ключа "homeworks"')
-    if not isinstance(response['homeworks'], list):
+    if not isinstance(homeworks, list):
         raise TypeError(
             'В ответе API "homeworks" не содержит список')
-    if 'current_date' not in response:
+    current_date = response.get('current_date', MISSING)
+    if current_date is MISSING:
         raise BadCurrentDate(
             'В ответе API нет ключа "current_date"')
-    if type(response['current_date']) is not int:
+    if not isinstance(current_date, int) or isinstance(current_date, bool):
         raise BadCurrentDate(
             'В ответе API ключ "current_date" содержит не время ответа')
-    return response['homeworks']
+    return homeworks
 
 
 def parse_status(homework):
@@ -107,33 +400,73 @@ def parse_status(homework):
         raise KeyError("Нет ключа 'status' в ответе API")
     if 'homework_name' not in homework:
         raise KeyError("Нет ключа 'homework_name' в ответе API")
-    homework_name = homework.get('homework_name')
-    homework_status = homework.get('status')
-    if homework_status not in HOMEWORK_VERDICTS:
+    homework_name = homework['homework_name']
+    homework_status = homework['status']
+    template = VERDICT_TEMPLATES.get(homework_status)
+    if template is None:
         raise KeyError(f"Неожиданный статус работы: '{homework_status}'")
-    verdict = HOMEWORK_VERDICTS[homework_status]
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    return template.format(name=homework_name)
+
+
+def missing_tokens():
+    """Возвращает имена отсутствующих переменных окружения."""
+    tokens = {
+        'PRACTICUM_TOKEN': PRACTICUM_TOKEN,
+        'TELEGRAM_TOKEN': TELEGRAM_TOKEN,
+        'TELEGRAM_CHAT_ID': TELEGRAM_CHAT_ID,
+    }
+    return [name for name, value in tokens.items() if not value]
 
 
 def check_tokens():
     """Проверяет наличие переменных окружения."""
-    return PRACTICUM_TOKEN and TELEGRAM_TOKEN and TELEGRAM_CHAT_ID
+    return not missing_tokens()
 
 
-def send_error_message(message, bot):
+def send_error_message(message, session):
     """
     Отправляет сообщение об ошибке в Telegram.
     В случае успеха возвращает отправленное сообщение
     """
     try:
-        send_message(message, bot)
+        send_message(message, session)
     except TelegramSendMessageError as error:
-        logging.error(error)
+        logger.error(error)
     else:
         return True
     return False
 
 
+def report_error(message, session, reported_errors):
+    """
+    Отправляет сообщение об ошибке в Telegram без повторов.
+    Сообщение не отправляется, если такое же уже было отправлено
+    за последние ERROR_REPORT_TTL секунд.
+    В reported_errors хранится время отправки
+    не более ERROR_REPORT_CACHE_SIZE последних сообщений.
+    """
+    now = monotonic()
+    sent_at = reported_errors.get(message)
+    if sent_at is not None and now - sent_at <= ERROR_REPORT_TTL:
+        return
+    if send_error_message(message, session):
+        reported_errors[message] = now
+        if len(reported_errors) > ERROR_REPORT_CACHE_SIZE:
+            del reported_errors[min(reported_errors, key=reported_errors.get)]
+
+
+def next_retry_time(retry_time, has_updates):
+    """
+    Вычисляет паузу до следующего запроса к API.
+    После ответа с обновлениями пауза сокращается до MIN_RETRY_TIME,
+    после пустого ответа растёт в RETRY_TIME_FACTOR раз, но не больше
+    RETRY_TIME.
+    """
+    if has_updates:
+        return MIN_RETRY_TIME
+    return min(retry_time * RETRY_TIME_FACTOR, RETRY_TIME)
+
+
 def main():
     """
     Основная логика работы бота.
@@ -141,56 +474,56 @@ def main():
     - Проверить ответ.
     - Если есть обновления — получить статус работы из обновления
         и отправить сообщение в TELEGRAM_CHAT_ID.
-    - Подождать некоторое RETRY_TIME и сделать новый запрос.
-    """
-    if not check_tokens():
-        lost_token_message = ''.join(
-            ['Нет переменных окружения: ',
-             str([token for token in
-                  ['PRACTICUM_TOKEN',
-                   'TELEGRAM_TOKEN',
-                   'TELEGRAM_CHAT_ID']
-                  if not globals()[token]])]
+    - Сообщения, не отправленные из-за временного сбоя,
+        повторить при следующем запросе.
+    - Подождать next_retry_time() и сделать новый запрос.
+    """
+    lost_tokens = missing_tokens()
+    if lost_tokens:
+        lost_token_message = (
+            f'Нет переменных окружения: {", ".join(lost_tokens)}'
         )
-        logging.critical(lost_token_message)
+        logger.critical(lost_token_message)
         sys.exit(lost_token_message)
 
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    last_error_message = ''
+    reported_errors = {}
+    unsent_messages = {}
     current_timestamp = int(time())
+    retry_time = START_RETRY_TIME
 
     while True:
+        poll_started = monotonic()
         try:
             api_data = get_api_answer(current_timestamp)
             homework_statuses = check_response(api_data)
-            if len(homework_statuses) > 0:
-                for homework in homework_statuses:
-                    send_message(parse_status(homework), bot)
+            messages = collect_messages(homework_statuses, unsent_messages)
+            if messages:
+                unsent_messages = send_messages(messages, SESSION)
             else:
-                logging.debug('Нет обновлений, я проверил')
+                logger.debug('Нет обновлений, я проверил')
+            retry_time = next_retry_time(
+                retry_time, len(homework_statuses) > 0
+            )
         except LoggingOnlyError as error:
-            logging.error(error)
+            logger.error(error)
         except Exception as error:
             message = f'Сбой в работе программы: {error}'
-            logging.error(message)
-            if message != last_error_message:
-                if send_error_message(message, bot):
-                    last_error_message = message
+            logger.error(message)
+            report_error(message, SESSION, reported_errors)
         else:
             current_timestamp = api_data['current_date'] or current_timestamp
-        finally:
-            sleep(RETRY_TIME)
+        sleep(max(0, poll_started + retry_time - monotonic()))
 
 
 if __name__ == '__main__':
+    if not LOG_VERBOSE:
+        logging._srcfile = None
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
     logging.basicConfig(
         level=logging.INFO,
         stream=sys.stdout,
-        format=('%(asctime)s '
-                '- %(levelname)s '
-                '- строка %(lineno)d '
-                '- %(funcName)s '
-                '- %(message)s'
-                )
+        format=VERBOSE_LOG_FORMAT if LOG_VERBOSE else LOG_FORMAT,
     )
     main()
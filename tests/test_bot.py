@@ -1,8 +1,9 @@
+import json
+import logging
 import os
 from http import HTTPStatus
 
 import requests
-import telegram
 import utils
 
 
@@ -44,6 +45,7 @@ class MockResponseGET:
         )
         self.random_timestamp = random_timestamp
         self.status_code = http_status
+        self.headers = {}
 
     def json(self):
         data = {
@@ -52,25 +54,51 @@ class MockResponseGET:
         }
         return data
 
+    @property
+    def content(self):
+        return json.dumps(self.json()).encode()
 
-class MockTelegramBot:
 
-    def __init__(self, token=None, random_timestamp=None, **kwargs):
-        assert token is not None, (
-            'Проверьте, что вы передали токен бота Telegram'
-        )
-        self.random_timestamp = random_timestamp
+class MockResponsePOST:
+
+    def __init__(self, http_status=HTTPStatus.OK, data=None, headers=None):
+        self.status_code = http_status
+        self.reason = http_status.phrase
+        self.headers = headers or {}
+        if data is None:
+            data = {'ok': http_status == HTTPStatus.OK}
+        self.data = data
+
+    @property
+    def content(self):
+        return json.dumps(self.data).encode()
 
-    def send_message(self, chat_id=None, text=None, **kwargs):
-        assert chat_id is not None, (
-            'Проверьте, что вы передали chat_id= при отправке '
-            'сообщения ботом Telegram'
+
+class MockTelegramSession:
+
+    def __init__(self, respond=None):
+        self.respond = respond or (lambda text: MockResponsePOST())
+        self.sent = []
+
+    def post(self, url, json=None, **kwargs):
+        assert url.startswith('https://api.telegram.org/bot'), (
+            'Проверьте, что сообщение отправляется в Telegram Bot API'
+        )
+        assert url.endswith('/sendMessage'), (
+            'Проверьте, что сообщение отправляется методом sendMessage'
         )
-        assert text is not None, (
-            'Проверьте, что вы передали text= при отправке '
-            'сообщения ботом Telegram'
+        assert json['chat_id'] is not None, (
+            'Проверьте, что вы передали chat_id при отправке '
+            'сообщения в Telegram'
         )
-        return self.random_timestamp
+        assert json['text'] is not None, (
+            'Проверьте, что вы передали text при отправке '
+            'сообщения в Telegram'
+        )
+        response = self.respond(json['text'])
+        if response.status_code == HTTPStatus.OK:
+            self.sent.append(json['text'])
+        return response
 
 
 class TestHomework:
@@ -153,30 +181,432 @@ class TestHomework:
     def test_bot_init_not_global(self):
         import homework
 
-        assert not (hasattr(homework, 'bot') and isinstance(getattr(homework, 'bot'), telegram.Bot)), (
-            'Убедитесь, что бот инициализирован только в main()'
+        assert not hasattr(homework, 'bot'), (
+            'Убедитесь, что бот не создаётся при импорте модуля'
         )
 
-    def test_logger(self, monkeypatch, random_timestamp):
-        def mock_telegram_bot(*args, **kwargs):
-            return MockTelegramBot(*args, random_timestamp=random_timestamp, **kwargs)
-
-        monkeypatch.setattr(telegram, "Bot", mock_telegram_bot)
-
+    def test_logger(self):
         import homework
 
         assert hasattr(homework, 'logging'), (
             'Убедитесь, что настроили логирование для вашего бота'
         )
 
-    def test_send_message(self, monkeypatch, random_timestamp):
-        def mock_telegram_bot(*args, **kwargs):
-            return MockTelegramBot(*args, random_timestamp=random_timestamp, **kwargs)
+    def test_send_message(self, monkeypatch):
+        import homework
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 12345)
+
+        func_name = 'send_message'
+        utils.check_function(homework, func_name, 2)
+        session = MockTelegramSession()
+        homework.send_message('text', session)
+        assert session.sent == ['text'], (
+            f'Убедитесь, что функция `{func_name}` отправляет сообщение '
+            'через переданную сессию'
+        )
+
+    def test_send_message_errors(self, monkeypatch):
+        token = '1234:SECRETTOKEN'
+
+        def connection_error(text):
+            raise requests.exceptions.ConnectionError(
+                f'Max retries exceeded with url: /bot{token}/sendMessage'
+            )
+
+        import homework
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', token)
+        monkeypatch.setattr(
+            homework, 'TELEGRAM_URL',
+            f'https://api.telegram.org/bot{token}/sendMessage'
+        )
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 12345)
+
+        monkeypatch.setattr(homework, 'sleep', lambda seconds: None)
+
+        func_name = 'send_message'
+        for http_status in (HTTPStatus.UNAUTHORIZED,
+                            HTTPStatus.TOO_MANY_REQUESTS):
+            try:
+                homework.send_message('text', MockTelegramSession(
+                    lambda text: MockResponsePOST(http_status)
+                ))
+            except homework.TelegramSendMessageError as error:
+                assert str(int(http_status)) in str(error), (
+                    f'Убедитесь, что функция `{func_name}` сообщает '
+                    'код ответа Telegram в тексте ошибки'
+                )
+            else:
+                assert False, (
+                    f'Убедитесь, что функция `{func_name}` выбрасывает '
+                    'TelegramSendMessageError при ответе Telegram '
+                    'с кодом, отличным от 200'
+                )
+        try:
+            homework.send_message(
+                'text', MockTelegramSession(connection_error)
+            )
+        except homework.TelegramSendMessageError as error:
+            assert token not in str(error), (
+                f'Убедитесь, что функция `{func_name}` не раскрывает '
+                'токен бота в тексте ошибки'
+            )
+        else:
+            assert False, (
+                f'Убедитесь, что функция `{func_name}` выбрасывает '
+                'TelegramSendMessageError при ошибке соединения'
+            )
+
+    def test_send_message_flood_wait(self, monkeypatch):
+        retry_after = 45
+        waits = []
+        answers = [
+            MockResponsePOST(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                data={
+                    'ok': False,
+                    'error_code': 429,
+                    'parameters': {'retry_after': retry_after},
+                },
+            ),
+            MockResponsePOST(),
+        ]
+        session = MockTelegramSession(lambda text: answers.pop(0))
+
+        import homework
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 12345)
+        monkeypatch.setattr(homework, 'sleep', waits.append)
+
+        func_name = 'send_message'
+        homework.send_message('text', session)
+        assert waits == [retry_after], (
+            f'Убедитесь, что функция `{func_name}` при ответе 429 '
+            'выжидает parameters.retry_after из ответа Telegram '
+            'полностью, даже если пауза больше BACKOFF_MAX'
+        )
+        assert session.sent == ['text'], (
+            f'Убедитесь, что функция `{func_name}` повторяет отправку '
+            'после паузы, которую попросил Telegram'
+        )
+
+    def test_urllib3_log_hides_token(self, monkeypatch, caplog):
+        token = '1234:SECRETTOKEN'
+
+        import homework
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', token)
+
+        for logger_name in homework.TOKEN_LOGGERS:
+            logging.getLogger(logger_name).warning(
+                'Retrying after connection broken: %s',
+                f'/bot{token}/sendMessage'
+            )
+        assert caplog.records, 'Проверьте, что записи лога urllib3 не теряются'
+        assert token not in caplog.text, (
+            'Убедитесь, что токен бота не попадает в логи urllib3'
+        )
+        assert '/bot***/sendMessage' in caplog.text
+
+    def test_send_messages_partial_failure(self, monkeypatch):
+        statuses = {
+            'rejected': HTTPStatus.BAD_REQUEST,
+            'flaky': HTTPStatus.BAD_GATEWAY,
+            'limited': HTTPStatus.TOO_MANY_REQUESTS,
+        }
+        session = MockTelegramSession(lambda text: MockResponsePOST(
+            statuses.get(text, HTTPStatus.OK)
+        ))
+
+        import homework
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 12345)
+        monkeypatch.setattr(homework, 'sleep', lambda seconds: None)
+
+        func_name = 'send_messages'
+        utils.check_function(homework, func_name, 2)
+        messages = {
+            name: name
+            for name in ['first', 'rejected', 'flaky', 'limited', 'last']
+        }
+        unsent = homework.send_messages(messages, session)
+        assert sorted(session.sent) == ['first', 'last'], (
+            f'Убедитесь, что в функции `{func_name}` ошибка отправки '
+            'одного сообщения не прерывает отправку остальных'
+        )
+        assert unsent == {'flaky': 'flaky', 'limited': 'limited'}, (
+            f'Убедитесь, что функция `{func_name}` возвращает для повтора '
+            'только сообщения, не отправленные из-за временного сбоя'
+        )
+        assert 'rejected' not in unsent, (
+            f'Убедитесь, что функция `{func_name}` не повторяет '
+            'сообщения, отклонённые Telegram'
+        )
+
+    def test_main_resends_only_unsent_messages(self, monkeypatch,
+                                               random_timestamp):
+        failed = []
+        timestamps = []
+        waits = []
+        now = [1000.0]
+        poll_duration = 7
+        answers = [
+            {
+                'homeworks': [
+                    {'homework_name': 'first', 'status': 'approved'},
+                    {'homework_name': 'second', 'status': 'rejected'},
+                ],
+                'current_date': random_timestamp,
+            },
+            {'homeworks': [], 'current_date': random_timestamp + 1},
+        ]
+
+        class StopMain(Exception):
+            pass
+
+        def respond(text):
+            if 'second' in text and not failed:
+                failed.append(text)
+                return MockResponsePOST(HTTPStatus.BAD_GATEWAY)
+            return MockResponsePOST()
+
+        session = MockTelegramSession(respond)
+
+        def mock_get_api_answer(current_timestamp):
+            timestamps.append(current_timestamp)
+            now[0] += poll_duration
+            return answers[len(timestamps) - 1]
+
+        def mock_sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+            if len(timestamps) == len(answers):
+                raise StopMain
+
+        import homework
+        monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'sometoken')
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 12345)
+        monkeypatch.setattr(homework, 'SESSION', session)
+        monkeypatch.setattr(homework, 'get_api_answer', mock_get_api_answer)
+        monkeypatch.setattr(homework, 'sleep', mock_sleep)
+        monkeypatch.setattr(homework, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(
+            homework, 'TELEGRAM_LIMITER',
+            homework.RateLimiter(homework.TELEGRAM_RATE_LIMIT)
+        )
+        try:
+            homework.main()
+        except StopMain:
+            pass
+
+        assert timestamps[1] == random_timestamp, (
+            'Убедитесь, что `main` переходит к следующему current_date, '
+            'даже если часть сообщений не отправлена'
+        )
+        sent = session.sent
+        assert len(sent) == 2 and len(set(sent)) == 2, (
+            'Убедитесь, что `main` повторно отправляет только '
+            'неотправленные сообщения'
+        )
+        assert failed[0] in sent, (
+            'Убедитесь, что `main` повторяет отправку неотправленного '
+            'сообщения при следующем запросе'
+        )
+        first_retry_time = homework.next_retry_time(
+            homework.START_RETRY_TIME, True
+        )
+        second_retry_time = homework.next_retry_time(first_retry_time, False)
+        assert waits == [
+            first_retry_time - poll_duration,
+            second_retry_time - poll_duration,
+        ], (
+            'Убедитесь, что `main` вычитает время, потраченное на итерацию, '
+            'из паузы до следующего запроса'
+        )
+
+    def test_main_drops_superseded_messages(self, monkeypatch,
+                                            random_timestamp):
+        timestamps = []
+        answers = [
+            {
+                'homeworks': [
+                    {'homework_name': 'hw', 'status': 'reviewing'},
+                ],
+                'current_date': random_timestamp,
+            },
+            {
+                'homeworks': [
+                    {'homework_name': 'hw', 'status': 'approved'},
+                ],
+                'current_date': random_timestamp + 1,
+            },
+            {'homeworks': [], 'current_date': random_timestamp + 2},
+        ]
+
+        class StopMain(Exception):
+            pass
+
+        def respond(text):
+            if len(timestamps) == 1:
+                return MockResponsePOST(HTTPStatus.BAD_GATEWAY)
+            return MockResponsePOST()
+
+        session = MockTelegramSession(respond)
+
+        def mock_get_api_answer(current_timestamp):
+            timestamps.append(current_timestamp)
+            return answers[len(timestamps) - 1]
+
+        def mock_sleep(seconds):
+            if len(timestamps) == len(answers):
+                raise StopMain
+
+        import homework
+        monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'sometoken')
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 12345)
+        monkeypatch.setattr(homework, 'SESSION', session)
+        monkeypatch.setattr(homework, 'get_api_answer', mock_get_api_answer)
+        monkeypatch.setattr(homework, 'sleep', mock_sleep)
+        try:
+            homework.main()
+        except StopMain:
+            pass
+
+        assert session.sent == [homework.parse_status(
+            {'homework_name': 'hw', 'status': 'approved'}
+        )], (
+            'Убедитесь, что `main` не отправляет устаревший статус работы, '
+            'если в новом ответе API у неё уже другой статус'
+        )
+
+    def test_rate_limiter(self, monkeypatch):
+        now = [1000.0]
+        waits = []
+
+        import homework
+        monkeypatch.setattr(homework, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(homework, 'sleep', waits.append)
+
+        limiter = homework.RateLimiter(2)
+        limiter.acquire()
+        limiter.acquire()
+        assert waits == [], (
+            'Убедитесь, что `RateLimiter` пропускает без ожидания '
+            'всплеск не больше rate вызовов'
+        )
+        limiter.acquire()
+        limiter.acquire()
+        assert waits == [0.5, 1.0], (
+            'Убедитесь, что `RateLimiter` ждёт, пока не освободится '
+            'место для очередного вызова'
+        )
+        now[0] += 10
+        waits.clear()
+        limiter.acquire()
+        limiter.acquire()
+        limiter.acquire()
+        assert waits == [0.5], (
+            'Убедитесь, что `RateLimiter` восстанавливает запас вызовов '
+            'не больше чем до rate'
+        )
+
+    def test_report_error_deduplicates(self, monkeypatch):
+        sent = []
+        now = [1000.0]
 
-        monkeypatch.setattr(telegram, "Bot", mock_telegram_bot)
+        import homework
+        monkeypatch.setattr(homework, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(
+            homework, 'send_error_message',
+            lambda message, bot: sent.append(message) or True
+        )
+
+        func_name = 'report_error'
+        reported_errors = {}
+        for message in ['A', 'B', 'A']:
+            homework.report_error(message, None, reported_errors)
+        assert sent == ['A', 'B'], (
+            f'Убедитесь, что функция `{func_name}` не отправляет повторно '
+            'уже отправленное сообщение об ошибке'
+        )
+        now[0] += homework.ERROR_REPORT_TTL + 1
+        homework.report_error('A', None, reported_errors)
+        assert sent == ['A', 'B', 'A'], (
+            f'Убедитесь, что функция `{func_name}` снова отправляет '
+            'сообщение об ошибке после ERROR_REPORT_TTL'
+        )
+        for index in range(homework.ERROR_REPORT_CACHE_SIZE + 1):
+            homework.report_error(str(index), None, reported_errors)
+        assert len(reported_errors) <= homework.ERROR_REPORT_CACHE_SIZE, (
+            f'Убедитесь, что функция `{func_name}` хранит не больше '
+            'ERROR_REPORT_CACHE_SIZE сообщений'
+        )
+
+    def test_jitter_retry_backoff(self, monkeypatch):
+        from urllib3.util.retry import RequestHistory
+
+        import homework
+        monkeypatch.setattr(homework.random, 'uniform', lambda a, b: b)
+
+        retry = homework.JitterRetry(
+            total=homework.API_ATTEMPTS - 1,
+            backoff_factor=homework.BACKOFF_FACTOR,
+        )
+        delays = []
+        for retries in range(1, 7):
+            history = tuple(
+                RequestHistory('GET', '/', None, HTTPStatus.BAD_GATEWAY, None)
+                for _ in range(retries)
+            )
+            delays.append(retry.new(history=history).get_backoff_time())
+        jitter = homework.BACKOFF_JITTER
+        assert delays == [
+            1 + jitter, 2 + jitter, 4 + jitter, 8 + jitter, 16 + jitter,
+            homework.BACKOFF_MAX
+        ], (
+            'Проверьте, что задержка перед каждым повтором запроса '
+            'растёт экспоненциально от 1 секунды, включает разброс '
+            'и ограничена BACKOFF_MAX'
+        )
+
+        class MockRetryAfterResponse:
+
+            def __init__(self, retry_after):
+                self.headers = {}
+                if retry_after is not None:
+                    self.headers['Retry-After'] = retry_after
+
+        assert retry.get_retry_after(
+            MockRetryAfterResponse('3600')
+        ) == homework.BACKOFF_MAX, (
+            'Проверьте, что ожидание по Retry-After '
+            'ограничено BACKOFF_MAX'
+        )
+        assert retry.get_retry_after(MockRetryAfterResponse('5')) == 5
+        assert retry.get_retry_after(MockRetryAfterResponse(None)) is None
 
+    def test_next_retry_time(self):
         import homework
-        utils.check_function(homework, 'send_message', 2)
+
+        func_name = 'next_retry_time'
+        utils.check_function(homework, func_name, 2)
+        assert homework.next_retry_time(
+            homework.RETRY_TIME, True
+        ) == homework.MIN_RETRY_TIME, (
+            f'Убедитесь, что функция `{func_name}` после ответа '
+            'с обновлениями сокращает паузу до MIN_RETRY_TIME'
+        )
+        assert homework.next_retry_time(60, False) == (
+            60 * homework.RETRY_TIME_FACTOR
+        ), (
+            f'Убедитесь, что функция `{func_name}` после пустого ответа '
+            'увеличивает паузу в RETRY_TIME_FACTOR раз'
+        )
+        retry_time = homework.START_RETRY_TIME
+        for _ in range(20):
+            retry_time = homework.next_retry_time(retry_time, False)
+        assert retry_time == homework.RETRY_TIME, (
+            f'Убедитесь, что функция `{func_name}` не делает паузу '
+            'дольше RETRY_TIME'
+        )
 
     def test_get_api_answers(self, monkeypatch, random_timestamp,
                              current_timestamp, api_url):
@@ -186,9 +616,8 @@ class TestHomework:
                 current_timestamp=current_timestamp, **kwargs
             )
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_response_get)
 
         func_name = 'get_api_answer'
         utils.check_function(homework, func_name, 1)
@@ -232,9 +661,8 @@ class TestHomework:
             response.json = json_invalid
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_500_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_500_response_get)
 
         func_name = 'get_api_answer'
         try:
@@ -247,6 +675,56 @@ class TestHomework:
                 'когда API возвращает код, отличный от 200'
             )
 
+    def test_get_api_answer_not_modified(self, monkeypatch, random_timestamp,
+                                         current_timestamp, api_url):
+        etag = f'"{random_timestamp}"'
+        request_headers = []
+
+        def mock_response_get(*args, **kwargs):
+            request_headers.append(kwargs.get('headers', {}))
+            response = MockResponseGET(
+                *args, random_timestamp=random_timestamp,
+                current_timestamp=current_timestamp, **kwargs
+            )
+            if kwargs['headers'].get('If-None-Match') == etag:
+                response.status_code = HTTPStatus.NOT_MODIFIED
+
+                def json_not_modified():
+                    assert False, (
+                        'Убедитесь, что при ответе API 304 '
+                        'тело ответа не разбирается повторно'
+                    )
+
+                response.json = json_not_modified
+                return response
+            response.headers = {'ETag': etag}
+            return response
+
+        import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_response_get)
+        monkeypatch.setattr(homework, 'API_CACHE', {
+            'from_date': None,
+            'etag': None,
+            'last_modified': None,
+            'payload': None,
+        })
+
+        func_name = 'get_api_answer'
+        first = homework.get_api_answer(current_timestamp)
+        second = homework.get_api_answer(current_timestamp)
+        assert 'If-None-Match' not in request_headers[0], (
+            f'Проверьте, что функция `{func_name}` не отправляет '
+            'If-None-Match до первого успешного ответа API'
+        )
+        assert request_headers[1].get('If-None-Match') == etag, (
+            f'Проверьте, что функция `{func_name}` отправляет '
+            'ETag предыдущего ответа в заголовке If-None-Match'
+        )
+        assert second == first, (
+            f'Проверьте, что функция `{func_name}` при ответе 304 '
+            'возвращает сохранённый ответ API'
+        )
+
     def test_parse_status(self, random_timestamp):
         test_data = {
             "id": 123,
@@ -315,9 +793,8 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_response_get)
 
         func_name = 'check_response'
         response = homework.get_api_answer(current_timestamp)
@@ -352,9 +829,8 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_response_get)
 
         func_name = 'parse_status'
         response = homework.get_api_answer(current_timestamp)
@@ -400,9 +876,8 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_response_get)
 
         func_name = 'parse_status'
         response = homework.get_api_answer(current_timestamp)
@@ -448,9 +923,8 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_response_get)
 
         func_name = 'parse_status'
         response = homework.get_api_answer(current_timestamp)
@@ -484,9 +958,8 @@ class TestHomework:
             response.json = json_invalid
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_no_homeworks_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_no_homeworks_response_get)
 
         func_name = 'check_response'
         result = homework.get_api_answer(current_timestamp)
@@ -525,9 +998,8 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_response_get)
 
         func_name = 'check_response'
         response = homework.get_api_answer(current_timestamp)
@@ -565,9 +1037,8 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_response_get)
 
         func_name = 'check_response'
         response = homework.get_api_answer(current_timestamp)
@@ -599,9 +1070,8 @@ class TestHomework:
             response.json = json_invalid
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_empty_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_empty_response_get)
 
         func_name = 'check_response'
         result = homework.get_api_answer(current_timestamp)
@@ -626,9 +1096,8 @@ class TestHomework:
             )
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
-
         import homework
+        monkeypatch.setattr(homework.SESSION, 'get', mock_response_get)
 
         func_name = 'check_response'
         try: